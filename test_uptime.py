@@ -0,0 +1,295 @@
+import gzip
+import http.server
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from unittest import mock
+
+import uptime
+
+FEED_BODY = b"<rss><channel><item><title>Feed</title></item></channel></rss>"
+FEED_ETAG = '"v1"'
+
+
+def _rss(*items):
+    """Build a feed from (title, pubDate datetime, description) tuples."""
+    body = "".join(
+        f"<item><title>{title}</title><pubDate>{format_datetime(pub)}</pubDate>"
+        f"<description>{desc}</description></item>"
+        for title, pub, desc in items
+    )
+    return f"<?xml version='1.0'?><rss><channel>{body}</channel></rss>".encode()
+
+
+class DurationParsingTests(unittest.TestCase):
+    def test_parses_minutes_only(self):
+        desc = "Something\nDuration: 30 minutes\nOther"
+        self.assertEqual(uptime.parse_duration(desc), timedelta(minutes=30))
+
+    def test_parses_hours_and_minutes(self):
+        desc = "Duration: 1 hour and 51 minutes"
+        self.assertEqual(uptime.parse_duration(desc), timedelta(hours=1, minutes=51))
+
+    def test_parses_hours_only(self):
+        self.assertEqual(uptime.parse_duration("Duration: 20 hours"), timedelta(hours=20))
+
+    def test_returns_none_when_no_duration_line(self):
+        self.assertIsNone(uptime.parse_duration("No duration here"))
+
+    def test_returns_none_when_zero(self):
+        self.assertIsNone(uptime.parse_duration("Duration: 0 minutes"))
+        self.assertIsNone(uptime.parse_duration("Duration: 0 hours"))
+
+
+class PubDateParsingTests(unittest.TestCase):
+    def test_matches_email_utils(self):
+        for text in [
+            "Wed, 21 Jun 2023 14:32:05 +0000",
+            "Thu, 01 Jun 2023 04:32:05 -0530",
+            "1 Jun 2023 04:32:05 +0100",
+            "Tue, 16 Dec 2025 12:34:56 GMT",
+            "Tue, 16 Dec 2025 12:34:56 +0000 ",
+            "Tue, 16 Dec 2025 12:34:56 -0000",
+        ]:
+            with self.subTest(text=text):
+                parsed = uptime.parse_pub_date(text)
+                expected = parsedate_to_datetime(text)
+                self.assertEqual(parsed, expected)
+                self.assertEqual(parsed.utcoffset(), expected.utcoffset())
+
+    def test_shares_tzinfo_per_offset(self):
+        a = uptime.parse_pub_date("Wed, 21 Jun 2023 14:32:05 -0130")
+        b = uptime.parse_pub_date("Thu, 22 Jun 2023 09:00:00 -0130")
+        self.assertIs(a.tzinfo, b.tzinfo)
+        utc = uptime.parse_pub_date("Wed, 21 Jun 2023 14:32:05 +0000")
+        self.assertIs(utc.tzinfo, timezone.utc)
+
+    def test_rejects_garbage(self):
+        with self.assertRaises((TypeError, ValueError)):
+            uptime.parse_pub_date("garbage")
+
+
+class ScanDescriptionTests(unittest.TestCase):
+    def test_newline_separated_fields(self):
+        desc = "Type: Incident\nAffected Components: API, Web\nDuration: 1 hour"
+        self.assertEqual(
+            uptime._scan_description(desc),
+            (timedelta(hours=1), "incident", ("API", "Web")),
+        )
+
+    def test_single_line_html_fields(self):
+        desc = (
+            "Type: Incident<br/>Duration: 1 hour and 5 minutes"
+            "<br/>Affected Components: API, Web"
+        )
+        duration, incident_type, components = uptime._scan_description(desc)
+        self.assertEqual(duration, timedelta(hours=1, minutes=5))
+        self.assertEqual(incident_type, "incident")
+        self.assertEqual(components, ("API", "Web"))
+
+    def test_type_after_duration_on_same_line(self):
+        desc = "Duration: 30 minutes Type: Maintenance"
+        self.assertEqual(
+            uptime._scan_description(desc)[:2],
+            (timedelta(minutes=30), "maintenance"),
+        )
+
+    def test_duration_after_components_on_same_line(self):
+        desc = "Affected Components: API, Duration: 5 minutes"
+        self.assertEqual(uptime._scan_description(desc)[0], timedelta(minutes=5))
+
+    def test_empty_description(self):
+        self.assertEqual(uptime._scan_description(""), (None, "", ()))
+
+
+class MergeIntervalsTests(unittest.TestCase):
+    def test_merges_overlapping_intervals(self):
+        base = 1_000_000
+        a = (base, base + 60)
+        b = (base + 30, base + 120)
+        c = (base + 200, base + 240)
+        self.assertEqual(
+            uptime.merge_intervals([c, b, a]),
+            [(base, base + 120), c],
+        )
+
+    def test_merges_touching_and_contained_intervals(self):
+        self.assertEqual(
+            uptime.merge_intervals([(0, 10), (10, 20), (2, 5)]),
+            [(0, 20)],
+        )
+
+    def test_empty(self):
+        self.assertEqual(uptime.merge_intervals([]), [])
+
+    def test_large_input_matches_pure_python_sweep(self):
+        n = uptime.NUMPY_MIN_INTERVALS
+        starts = [(i * 7919) % (n * 5) for i in range(n)]
+        intervals = [(start, start + 3 + start % 11) for start in starts]
+        with mock.patch.object(uptime, "NUMPY_MIN_INTERVALS", n + 1):
+            expected = uptime.merge_intervals(list(intervals))
+        self.assertEqual(uptime.merge_intervals(list(intervals)), expected)
+
+
+class IterItemsTests(unittest.TestCase):
+    FEED = (
+        b"<?xml version='1.0'?><rss><channel><title>Status</title>"
+        b"<item><title> Outage </title><pubDate>Wed, 21 Jun 2023 14:32:05 +0000</pubDate>"
+        b"<description>Type: Incident\nAffected Components: API, Web\n"
+        b"Duration: 1 hour and 5 minutes</description></item>"
+        b"<item><title>No date</title><description>Duration: 5 minutes</description></item>"
+        b"<item><title>Bad date</title><pubDate>garbage</pubDate></item>"
+        b"<item><title>Maint</title><pubDate>Thu, 22 Jun 2023 09:00:00 +0100</pubDate>"
+        b"<description>Type: Maintenance</description></item>"
+        b"</channel></rss>"
+    )
+
+    def expected(self):
+        return [
+            uptime.FeedItem(
+                title="Outage",
+                pub_date=datetime(2023, 6, 21, 14, 32, 5, tzinfo=timezone.utc),
+                pub_ts=1687357925,
+                duration=timedelta(hours=1, minutes=5),
+                type="incident",
+                components=("API", "Web"),
+            ),
+            uptime.FeedItem(
+                title="Maint",
+                pub_date=datetime(2023, 6, 22, 8, 0, 0, tzinfo=timezone.utc),
+                pub_ts=1687420800,
+                duration=None,
+                type="maintenance",
+                components=(),
+            ),
+        ]
+
+    def test_parses_items(self):
+        self.assertEqual(list(uptime.iter_items(self.FEED)), self.expected())
+
+    def test_parses_items_with_stdlib_parser(self):
+        with mock.patch.object(uptime, "LET", None):
+            self.assertEqual(list(uptime.iter_items(self.FEED)), self.expected())
+
+
+class IterItemsWindowTests(unittest.TestCase):
+    window_start = datetime(2025, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+    window_end = datetime(2025, 7, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+    def titles(self, *pub_dates):
+        feed = _rss(*((f"item{i}", pub, "Duration: 1 hour") for i, pub in enumerate(pub_dates)))
+        return [item.title for item in uptime.iter_items(feed, self.window_start, self.window_end)]
+
+    def test_keeps_item_at_earliest_plausible_start(self):
+        earliest = self.window_start - uptime.MAX_PLAUSIBLE_DURATION
+        self.assertEqual(self.titles(earliest), ["item0"])
+
+    def test_drops_item_one_second_before_earliest_plausible_start(self):
+        earliest = self.window_start - uptime.MAX_PLAUSIBLE_DURATION
+        self.assertEqual(self.titles(earliest - timedelta(seconds=1)), [])
+
+    def test_keeps_item_at_window_end(self):
+        self.assertEqual(self.titles(self.window_end), ["item0"])
+
+    def test_drops_item_after_window_end(self):
+        self.assertEqual(self.titles(self.window_end + timedelta(seconds=1)), [])
+
+    def test_no_window_keeps_everything(self):
+        feed = _rss(("old", datetime(2000, 1, 1, tzinfo=timezone.utc), ""))
+        self.assertEqual([item.title for item in uptime.iter_items(feed)], ["old"])
+
+
+class _FeedHandler(http.server.BaseHTTPRequestHandler):
+    requests = []  # headers of every request received, in order
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.path == "/always-304" or self.headers.get("If-None-Match") == FEED_ETAG:
+            self.send_response(304)
+            self.send_header("ETag", FEED_ETAG)
+            self.end_headers()
+            return
+
+        body = FEED_BODY
+        compress = self.path == "/gzip" and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body)
+
+        self.send_response(200)
+        self.send_header("ETag", FEED_ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FetchFeedTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _FeedHandler.requests = []
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name) / "bigchange-uptime"
+        for patcher in (
+            mock.patch.object(uptime, "CACHE_DIR", self.cache_dir),
+            mock.patch.object(uptime, "FEED_CACHE_PATH", self.cache_dir / "feed.xml"),
+            mock.patch.object(uptime, "FEED_META_PATH", self.cache_dir / "feed.json"),
+            mock.patch.dict(os.environ, {"no_proxy": "*", "NO_PROXY": "*"}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_caches_body_and_reuses_it_on_304(self):
+        url = self.base_url + "/history.rss"
+        self.assertEqual(uptime.fetch_feed(url), FEED_BODY)
+        self.assertEqual((self.cache_dir / "feed.xml").read_bytes(), FEED_BODY)
+        meta = json.loads((self.cache_dir / "feed.json").read_text())
+        self.assertEqual((meta["url"], meta["etag"]), (url, FEED_ETAG))
+
+        self.assertEqual(uptime.fetch_feed(url), FEED_BODY)
+        self.assertNotIn("If-None-Match", _FeedHandler.requests[0])
+        self.assertEqual(_FeedHandler.requests[1]["If-None-Match"], FEED_ETAG)
+
+    def test_ignores_cache_written_for_another_url(self):
+        self.cache_dir.mkdir(parents=True)
+        (self.cache_dir / "feed.xml").write_bytes(b"stale")
+        (self.cache_dir / "feed.json").write_text(
+            json.dumps({"url": "http://example.invalid/", "etag": FEED_ETAG})
+        )
+
+        self.assertEqual(uptime.fetch_feed(self.base_url + "/history.rss"), FEED_BODY)
+        self.assertNotIn("If-None-Match", _FeedHandler.requests[0])
+
+    def test_requests_gzip_and_caches_decompressed_body(self):
+        self.assertEqual(uptime.fetch_feed(self.base_url + "/gzip"), FEED_BODY)
+        self.assertEqual(_FeedHandler.requests[0]["Accept-Encoding"], "gzip")
+        self.assertEqual((self.cache_dir / "feed.xml").read_bytes(), FEED_BODY)
+
+    def test_304_without_cached_body_raises(self):
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            uptime.fetch_feed(self.base_url + "/always-304")
+        self.assertEqual(cm.exception.code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()